@@ -68,9 +68,9 @@ def get_signal_chunks(shape, dtype, signal_axes=None, target_size=1e6):
     if signals_per_chunk < 2 or num_nav_axes == 0:
         # signal is larger than chunk max
         chunks = [s if i in signal_axes else 1 for i, s in enumerate(shape)]
-        return tuple(chunks)
+        return tuple(int(x) for x in chunks)
     elif signals_per_chunk > num_signals:
-        return shape
+        return tuple(int(x) for x in shape)
     else:
         # signal is smaller than chunk max
         # Index of axes with size smaller than required to make all chunks equal
@@ -106,6 +106,22 @@ def get_signal_chunks(shape, dtype, signal_axes=None, target_size=1e6):
         return tuple(int(x) for x in chunks)
 
 
+def _ravel_ragged(data):
+    """Returns an object array with the flattened items of a ragged array."""
+    new_data = np.empty(shape=data.shape, dtype=object)
+    for i in np.ndindex(data.shape):
+        new_data[i] = data[i].ravel()
+    return new_data
+
+
+def _get_ragged_shapes(data):
+    """Returns an object array with the shapes of the items of a ragged array."""
+    shapes = np.empty(shape=data.shape, dtype=object)
+    for i in np.ndindex(data.shape):
+        shapes[i] = np.array(data[i].shape)
+    return shapes
+
+
 class HierarchicalReader:
     """A generic Reader class for reading data from hierarchical file types."""
 
@@ -226,6 +242,11 @@ class HierarchicalReader:
 
         return exp_dict_list
 
+    @staticmethod
+    def _read_dataset(dataset):
+        """Reads a dataset into a numpy array."""
+        return np.asanyarray(dataset)
+
     def group2signaldict(self, group, lazy=False):
         """
         Reads a h5py/zarr group and returns a signal dictionary.
@@ -268,6 +289,7 @@ class HierarchicalReader:
             exp["package_version"] = ""
 
         data = group["data"]
+        chunks = data.chunks
         try:
             ragged_shape = group["ragged_shapes"]
             new_data = np.empty(shape=data.shape, dtype=object)
@@ -277,10 +299,10 @@ class HierarchicalReader:
         except KeyError:
             pass
         if lazy:
-            data = da.from_array(data, chunks=data.chunks)
+            data = da.from_array(data, chunks=chunks)
             exp["attributes"]["_lazy"] = True
         else:
-            data = np.asanyarray(data)
+            data = self._read_dataset(data)
         exp["data"] = data
         axes = []
         for i in range(len(exp["data"].shape)):
@@ -480,7 +502,7 @@ class HierarchicalReader:
         for key, value in group.attrs.items():
             if isinstance(value, bytes):
                 value = value.decode()
-            if isinstance(value, (np.string_, str)):
+            if isinstance(value, (np.bytes_, str)):
                 if value == "_None_":
                     value = None
             elif isinstance(value, np.bool_):
@@ -616,7 +638,15 @@ class HierarchicalWriter:
         raise NotImplementedError("This method must be implemented by subclasses.")
 
     @classmethod
-    def overwrite_dataset(cls, group, data, key, signal_axes=None, chunks=None, **kwds):
+    def _get_target_size(cls, group):
+        """Returns the target size in bytes of the chunks of the datasets
+        written to ``group``."""
+        return cls.target_size
+
+    @classmethod
+    def overwrite_dataset(
+        cls, group, data, key, signal_axes=None, chunks=None, dtype=None, **kwds
+    ):
         """
         Overwrites a dataset into a hierarchical structure following the h5py
         API.
@@ -636,6 +666,10 @@ class HierarchicalWriter:
             the chunks of the dask array will be used otherwise the chunks
             will be determined by the
             :py:func:`~.io_plugins._hierarchical.get_signal_chunks` function.
+        dtype : numpy dtype, None
+            The dtype of the dataset. If ``None``, the dtype of ``data`` is
+            used, otherwise the data are converted when they are stored. Not
+            used for ragged arrays.
         kwds : dict
             Any additional keywords for to be passed to the
             :py:meth:`h5py.Group.require_dataset` or
@@ -649,11 +683,16 @@ class HierarchicalWriter:
                 # If signal_axes=None, use automatic h5py chunking, otherwise
                 # optimise the chunking to contain at least one signal per chunk
                 chunks = get_signal_chunks(
-                    data.shape, data.dtype, signal_axes, cls.target_size
+                    data.shape,
+                    data.dtype if dtype is None else dtype,
+                    signal_axes,
+                    cls._get_target_size(group),
                 )
         if np.issubdtype(data.dtype, np.dtype("U")):
             # Saving numpy unicode type is not supported in h5py
             data = data.astype(np.dtype("S"))
+        if dtype is None:
+            dtype = data.dtype
 
         if data.dtype == np.dtype("O"):
             dset = cls._get_object_dset(group, data, key, chunks, **kwds)
@@ -665,7 +704,7 @@ class HierarchicalWriter:
                     these_kwds.update(
                         dict(
                             shape=data.shape,
-                            dtype=data.dtype,
+                            dtype=dtype,
                             exact=True,
                             chunks=chunks,
                         )
@@ -682,11 +721,14 @@ class HierarchicalWriter:
 
         _logger.info(f"Chunks used for saving: {chunks}")
         if data.dtype == np.dtype("O"):
-            new_data = np.empty(shape=data.shape, dtype=object)
-            shapes = np.empty(shape=data.shape, dtype=object)
-            for i in np.ndindex(data.shape):
-                new_data[i] = data[i].ravel()
-                shapes[i] = np.array(data[i].shape)
+            if isinstance(data, da.Array):
+                # Process the ragged array block by block, so that the items
+                # are written chunk-wise without loading the whole array
+                new_data = data.map_blocks(_ravel_ragged, dtype=object)
+                shapes = data.map_blocks(_get_ragged_shapes, dtype=object)
+            else:
+                new_data = _ravel_ragged(data)
+                shapes = _get_ragged_shapes(data)
             shape_dset = cls._get_object_dset(
                 group, shapes, "ragged_shapes", shapes.shape, **kwds
             )
@@ -700,7 +742,9 @@ class HierarchicalWriter:
     def write(self):
         self.write_signal(self.signal, self.group, **self.kwds)
 
-    def write_signal(self, signal, group, write_dataset=True, chunks=None, **kwds):
+    def write_signal(
+        self, signal, group, write_dataset=True, chunks=None, dtype=None, **kwds
+    ):
         "Writes a hyperspy signal to a hdf5 group"
         group.attrs.update(signal["package_info"])
 
@@ -728,6 +772,7 @@ class HierarchicalWriter:
                     if not axis["navigate"]
                 ],
                 chunks=chunks,
+                dtype=dtype,
                 **kwds,
             )
 
@@ -749,6 +794,9 @@ class HierarchicalWriter:
     def dict2group(self, dictionary, group, **kwds):
         "Recursive writer of dicts and signals"
 
+        # The attributes are written at once at the end, since zarr serializes
+        # and writes all the attributes of a group every time one is set
+        attrs = {}
         for key, value in dictionary.items():
             if isinstance(value, dict):
                 self.dict2group(value, group.require_group(key), **kwds)
@@ -756,33 +804,45 @@ class HierarchicalWriter:
                 self.overwrite_dataset(group, value, key, **kwds)
 
             elif value is None:
-                group.attrs[key] = "_None_"
+                attrs[key] = "_None_"
 
             elif isinstance(value, bytes):
                 try:
                     # binary string if has any null characters (otherwise not
                     # supported by hdf5)
                     value.index(b"\x00")
-                    group.attrs["_bs_" + key] = np.void(value)
+                    attrs["_bs_" + key] = np.void(value)
                 except ValueError:
-                    group.attrs[key] = value.decode()
+                    attrs[key] = value.decode()
 
             elif isinstance(value, str):
-                group.attrs[key] = value
+                attrs[key] = value
 
             elif isinstance(value, list):
                 if len(value):
                     self.parse_structure(key, group, value, "_list_", **kwds)
                 else:
-                    group.attrs["_list_empty_" + key] = "_None_"
+                    attrs["_list_empty_" + key] = "_None_"
 
             elif isinstance(value, tuple):
                 if len(value):
                     self.parse_structure(key, group, value, "_tuple_", **kwds)
                 else:
-                    group.attrs["_tuple_empty_" + key] = "_None_"
+                    attrs["_tuple_empty_" + key] = "_None_"
 
             else:
+                attrs[key] = value
+
+        self._write_attrs(group, attrs)
+
+    @staticmethod
+    def _write_attrs(group, attrs):
+        """Write the attributes of a group, skipping those which can't be written"""
+        try:
+            group.attrs.update(attrs)
+        except Exception:
+            # Write them one by one to find those which can't be written
+            for key, value in attrs.items():
                 try:
                     group.attrs[key] = value
                 except Exception:
@@ -809,7 +869,7 @@ class HierarchicalWriter:
                 group.require_group(_type + str(len(value)) + "_" + key),
                 **kwds,
             )
-        elif tmp.dtype.type is np.unicode_:
+        elif tmp.dtype.type is np.str_:
             if _type + key in group:
                 del group[_type + key]
             group.create_dataset(
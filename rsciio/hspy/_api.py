@@ -270,8 +270,6 @@ def file_writer(filename, signal, close_file=True, **kwds):
     try:
         writer = HyperspyWriter(f, signal, expg, **kwds)
         writer.write()
-    except Exception:
-        raise
     finally:
         del smd["record_by"]
 
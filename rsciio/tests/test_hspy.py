@@ -110,29 +110,7 @@ class Example1:
     "Used as a base class for the TestExample classes below"
 
     def test_data(self):
-        assert [
-            4066.0,
-            3996.0,
-            3932.0,
-            3923.0,
-            5602.0,
-            5288.0,
-            7234.0,
-            7809.0,
-            4710.0,
-            5015.0,
-            4366.0,
-            4524.0,
-            4832.0,
-            5474.0,
-            5718.0,
-            5034.0,
-            4651.0,
-            4613.0,
-            4637.0,
-            4429.0,
-            4217.0,
-        ] == self.s.data.tolist()
+        np.testing.assert_array_equal(self.s.data, data)
 
     def test_original_metadata(self):
         assert example1_original_metadata == self.s.original_metadata.as_dictionary()
@@ -220,6 +198,29 @@ class TestSavingMetadataContainers:
         # It should finish in less that 2 s on CI
         assert end - start < 2.0
 
+    @zspy_marker
+    def test_save_many_items(self, tmp_path, file):
+        s = self.s
+        items = {f"item{i}": i for i in range(1000)}
+        s.metadata.set_item("many_items", items)
+        fname = tmp_path / file
+        s.save(fname)
+        l = hs.load(fname)
+        assert l.metadata.many_items.as_dictionary() == items
+
+    @zspy_marker
+    def test_save_unwritable_item(self, tmp_path, file, caplog):
+        s = self.s
+        s.metadata.set_item("test.unwritable", object())
+        s.metadata.set_item("test.writable", 1)
+        fname = tmp_path / file
+        with caplog.at_level(logging.ERROR):
+            s.save(fname)
+        assert "could not write" in caplog.text
+        l = hs.load(fname)
+        assert l.metadata.test.writable == 1
+        assert "unwritable" not in l.metadata.test
+
     @zspy_marker
     def test_numpy_only_inner_lists(self, tmp_path, file):
         s = self.s
@@ -873,17 +874,25 @@ def test_chunking_saving_lazy(tmp_path, file):
     s = hs.signals.Signal2D(da.zeros((50, 100, 100))).as_lazy()
     s.data = s.data.rechunk([50, 25, 25])
 
-    filename = tmp_path / "test_chunking_saving_lazy.hspy"
-    filename2 = tmp_path / "test_chunking_saving_lazy_chunks_True.hspy"
-    filename3 = tmp_path / "test_chunking_saving_lazy_chunks_specified.hspy"
+    ext = Path(file).suffix
+    filename = tmp_path / f"test_chunking_saving_lazy{ext}"
+    filename2 = tmp_path / f"test_chunking_saving_lazy_chunks_True{ext}"
+    filename3 = tmp_path / f"test_chunking_saving_lazy_chunks_specified{ext}"
     s.save(filename)
     s1 = hs.load(filename, lazy=True)
     assert s.data.chunks == s1.data.chunks
+    if ext == ".zspy":
+        import zarr
+
+        # chunks filled with zeros are not written
+        dset = zarr.open(filename.__str__(), mode="r")["Experiments/__unnamed__/data"]
+        assert dset.nchunks_initialized == 0
 
-    # with chunks=True, use h5py chunking
+    # with chunks=True, use h5py/zarr chunking
     s.save(filename2, chunks=True)
     s2 = hs.load(filename2, lazy=True)
-    assert tuple([c[0] for c in s2.data.chunks]) == (7, 25, 25)
+    if ext == ".hspy":
+        assert tuple([c[0] for c in s2.data.chunks]) == (7, 25, 25)
 
     # specify chunks
     chunks = (50, 10, 10)
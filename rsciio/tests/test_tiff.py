@@ -172,6 +172,20 @@ def test_read_unit_from_DM_stack(lazy):
         )
 
 
+@pytest.mark.parametrize("prefetch_limit", [None, 1, 1e9])
+def test_read_prefetch(prefetch_limit):
+    fname = os.path.join(
+        MY_PATH, "tiff_files", "test_loading_image_saved_with_DM_stack.tif"
+    )
+    s = hs.load(fname)
+    s2 = hs.load(fname, prefetch_limit=prefetch_limit)
+    _compare_signal_shape_data(s, s2)
+    for i in range(3):
+        assert s2.axes_manager[i].units == s.axes_manager[i].units
+        assert s2.axes_manager[i].scale == s.axes_manager[i].scale
+    assert s2.metadata.General.original_filename == os.path.basename(fname)
+
+
 def test_read_unit_from_imagej_stack_no_scale():
     fname = os.path.join(
         MY_PATH, "tiff_files", "test_loading_image_saved_with_imageJ_stack_no_scale.tif"
@@ -250,6 +264,114 @@ def test_saving_with_custom_tag():
         assert s2.original_metadata["Number_65000"] == "Random metadata"
 
 
+@pytest.mark.parametrize("load_thumbnails", [True, False])
+def test_read_load_thumbnails(tmp_path, load_thumbnails):
+    fname = tmp_path / "test_read_load_thumbnails.tif"
+    icc_profile = bytes(range(64))
+    tifffile.imwrite(
+        fname,
+        np.arange(10 * 15, dtype=np.uint8).reshape((10, 15)),
+        extratags=[(34675, 7, len(icc_profile), icc_profile, False)],
+    )
+    s = hs.load(fname, load_thumbnails=load_thumbnails)
+    assert ("InterColorProfile" in s.original_metadata) is load_thumbnails
+    if load_thumbnails:
+        assert s.original_metadata["InterColorProfile"] == icc_profile
+
+
+def test_write_lazy_stack(tmp_path):
+    fname = tmp_path / "test_write_lazy_stack.tif"
+    data = np.arange(7 * 20 * 30, dtype=np.float32).reshape((7, 20, 30))
+    s = hs.signals.Signal2D(data).as_lazy()
+    s.data = s.data.rechunk((3, 10, 10))
+    s.axes_manager[0].scale = 2.5
+    s.save(fname)
+    s2 = hs.load(fname)
+    np.testing.assert_array_equal(s2.data, data)
+    np.testing.assert_allclose(s2.axes_manager[0].scale, 2.5)
+
+
+def test_iter_pages_blocks():
+    import dask
+    import dask.array as da
+    from rsciio.tiff._api import _iter_pages
+
+    data = da.arange(2 * 30 * 8 * 8, dtype=np.float64).reshape(2, 30, 8, 8)
+    data = data.rechunk((2, 10, 4, 4))
+    sizes = []
+
+    def record(block):
+        sizes.append(block.shape[0])
+        return block
+
+    with dask.config.set({"array.chunk-size": "4KiB"}):
+        pages = list(_iter_pages(data.map_blocks(record)))
+    np.testing.assert_array_equal(np.stack(pages), data.compute().reshape(-1, 8, 8))
+    # the blocks computed contain a few pages, not the whole navigation axes
+    assert max(sizes) < 30
+
+
+def test_iter_pages_keep_chunks():
+    import dask.array as da
+    from rsciio.tiff._api import _iter_pages
+
+    data = da.arange(2 * 30 * 8 * 8).reshape(2, 30, 8, 8).rechunk((1, 10, 8, 8))
+    calls = []
+
+    def record(block):
+        calls.append(block.shape)
+        return block
+
+    pages = list(_iter_pages(data.map_blocks(record)))
+    np.testing.assert_array_equal(np.stack(pages), data.compute().reshape(-1, 8, 8))
+    # each chunk is computed only once (dask also calls `record` with empty
+    # arrays to infer the metadata)
+    assert calls.count((1, 10, 8, 8)) == data.npartitions
+
+
+def test_iter_pages_single_chunk():
+    import dask
+    import dask.array as da
+    from rsciio.tiff._api import _iter_pages
+
+    calls = []
+
+    def load():
+        calls.append(1)
+        return np.arange(6 * 8 * 8).reshape(6, 8, 8)
+
+    data = da.from_delayed(dask.delayed(load)(), shape=(6, 8, 8), dtype=int)
+    pages = list(_iter_pages(data))
+    assert len(calls) == 1
+    np.testing.assert_array_equal(np.stack(pages), load())
+
+
+@pytest.mark.parametrize(
+    "axes, names",
+    [("MYX", ["mosaic", "height", "width"]), ("OYX", ["", "height", "width"])],
+)
+def test_read_axes_names(tmp_path, axes, names):
+    fname = tmp_path / "test_read_axes_names.tif"
+    tifffile.imwrite(
+        fname, np.zeros((2, 5, 6), dtype=np.uint8), metadata={"axes": axes}
+    )
+    s = hs.load(fname)
+    assert s.data.shape == (2, 5, 6)
+    assert [axis.name for axis in s.axes_manager._axes] == names
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+@pytest.mark.parametrize("lazy", [True, False])
+def test_read_memmap(tmp_path, compression, lazy):
+    fname = tmp_path / "test_read_memmap.tif"
+    data = np.arange(5 * 10 * 15, dtype=np.uint16).reshape((5, 10, 15))
+    tifffile.imwrite(fname, data, compression=compression)
+    s = hs.load(fname, memmap=True, lazy=lazy)
+    np.testing.assert_array_equal(s.data, data)
+    if not lazy:
+        assert isinstance(s.data, np.memmap) is (compression is None)
+
+
 def _test_read_unit_from_dm():
     fname = os.path.join(MY_PATH2, "test_loading_image_saved_with_DM.tif")
     s = hs.load(fname)
@@ -970,6 +1092,16 @@ class TestReadHamamatsu:
             rtol=1e-5,
         )
 
+    def test_hamamatsu_streak_prefetch(self):
+        file = "test_hamamatsu_streak_SCAN.tif"
+        fname = os.path.join(self.path, file)
+
+        s = hs.load(fname, hamamatsu_streak_axis_type="data")
+        s2 = hs.load(fname, hamamatsu_streak_axis_type="data", prefetch_limit=1e9)
+
+        _compare_signal_shape_data(s, s2)
+        np.testing.assert_allclose(s2.axes_manager[1].axis, s.axes_manager[1].axis)
+
     def test_is_hamamatsu_streak(self):
         file = "test_hamamatsu_streak_SCAN.tif"
         fname = os.path.join(self.path, file)
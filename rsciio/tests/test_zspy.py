@@ -25,6 +25,7 @@ import pytest
 hs = pytest.importorskip("hyperspy.api", reason="hyperspy not installed")
 # zarr (because of numcodecs) is only supported on x86_64 machines
 zarr = pytest.importorskip("zarr", reason="zarr not installed")
+numcodecs = pytest.importorskip("numcodecs", reason="numcodecs not installed")
 
 
 class TestZspy:
@@ -99,6 +100,21 @@ class TestZspy:
         d = f["Experiments/__unnamed__/data"]
         assert d.compressor == comp
 
+    @pytest.mark.parametrize(
+        "dtype, cname, shuffle",
+        [
+            (float, "lz4", numcodecs.Blosc.BITSHUFFLE),
+            (np.int64, "zstd", numcodecs.Blosc.SHUFFLE),
+        ],
+    )
+    def test_default_compressor(self, tmp_path, dtype, cname, shuffle):
+        filename = tmp_path / "testfile.zspy"
+        hs.signals.BaseSignal(np.arange(10, dtype=dtype)).save(filename)
+        f = zarr.open(filename.__str__(), mode="r")
+        compressor = f["Experiments/__unnamed__/data"].compressor
+        assert compressor.cname == cname
+        assert compressor.shuffle == shuffle
+
     @pytest.mark.parametrize("compressor", (None, "default", "blosc"))
     def test_compression(self, compressor, tmp_path):
         if compressor == "blosc":
@@ -122,3 +138,270 @@ def test_non_valid_zspy(tmp_path, caplog):
     with pytest.raises(IOError):
         with caplog.at_level(logging.ERROR):
             _ = hs.load(filename)
+
+
+@pytest.mark.parametrize(
+    "dask_chunks, aligned",
+    [
+        (((4, 4, 2), (10,)), True),
+        (((8, 2), (10,)), True),
+        (((3, 3, 3, 1), (10,)), False),
+        (((4, 4, 2), (5, 5)), False),
+    ],
+)
+def test_chunks_aligned(dask_chunks, aligned):
+    from rsciio.zspy._api import _chunks_aligned
+
+    assert _chunks_aligned(dask_chunks, (2, 10)) is aligned
+
+
+@pytest.mark.parametrize("chunks", [(4, 10), (3, 5)])
+def test_save_lazy_aligned_chunks(tmp_path, chunks):
+    filename = tmp_path / "test_save_lazy_aligned_chunks.zspy"
+    s = hs.signals.Signal1D(np.arange(100).reshape(10, 10)).as_lazy()
+    s.data = s.data.rechunk(chunks)
+    s.save(filename, chunks=(2, 10))
+    f = zarr.open(filename.__str__(), mode="r")
+    assert f["Experiments/__unnamed__/data"].chunks == (2, 10)
+    np.testing.assert_array_equal(hs.load(filename).data, s.data.compute())
+
+
+def test_save_chunks_remote_store(tmp_path):
+    # Local FSStore used as a stand-in for a remote store
+    pytest.importorskip("fsspec", reason="fsspec not installed")
+    from rsciio.zspy._api import ZspyWriter
+
+    s = hs.signals.Signal1D(np.zeros((64, 64, 1024)))
+    store = zarr.storage.FSStore(str(tmp_path / "test_remote.zspy"))
+    s.save(store)
+    f = zarr.open(str(tmp_path / "test_remote.zspy"), mode="r")
+    chunks = f["Experiments/__unnamed__/data"].chunks
+    assert chunks[-1] == 1024
+    assert np.prod(chunks) * 8 <= ZspyWriter.remote_target_size
+    np.testing.assert_array_equal(hs.load(store).data, s.data)
+
+
+def test_store_data_from_zarr_array():
+    from rsciio.zspy._api import ZspyWriter
+
+    group = zarr.group()
+    source = group.create_dataset("source", data=np.arange(100).reshape(10, 10))
+    dset = group.create_dataset("dest", shape=(10, 10), chunks=(5, 5), dtype=int)
+    ZspyWriter._store_data(source, dset, group, "dest", dset.chunks)
+    np.testing.assert_array_equal(dset[:], source[:])
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_save_lazy_ragged_array(tmp_path, lazy):
+    data = np.empty((4, 5), dtype=object)
+    for i in np.ndindex(data.shape):
+        data[i] = np.arange(sum(i) + 1)
+    s = hs.signals.BaseSignal(data, ragged=True).as_lazy()
+    s.data = s.data.rechunk((2, 2))
+    filename = tmp_path / "test_save_lazy_ragged_array.zspy"
+    s.save(filename)
+    s2 = hs.load(filename, lazy=lazy)
+    data2 = s2.data.compute() if lazy else s2.data
+    for i in np.ndindex(data.shape):
+        np.testing.assert_array_equal(data2[i], data[i])
+
+
+def test_save_multiple_chunks(tmp_path):
+    filename = tmp_path / "test_save_multiple_chunks.zspy"
+    s = hs.signals.Signal2D(np.arange(4 * 5 * 6 * 7).reshape(4, 5, 6, 7))
+    s.save(filename, chunks=(2, 2, 6, 7))
+    f = zarr.open(filename.__str__(), mode="r")
+    assert f["Experiments/__unnamed__/data"].nchunks == 6
+    np.testing.assert_array_equal(hs.load(filename).data, s.data)
+
+
+def test_consolidated_metadata(tmp_path):
+    filename = tmp_path / "test_consolidated_metadata.zspy"
+    s = hs.signals.Signal1D(np.arange(10))
+    s.metadata.General.title = "test"
+    s.save(filename)
+    assert (filename / ".zmetadata").is_file()
+    s2 = hs.load(filename)
+    assert s2.metadata.General.title == "test"
+
+    # files without consolidated metadata can still be read
+    (filename / ".zmetadata").unlink()
+    s3 = hs.load(filename)
+    assert s3.metadata.General.title == "test"
+    np.testing.assert_array_equal(s3.data, s.data)
+
+
+@pytest.mark.parametrize("write_empty_chunks", [None, True, False])
+def test_write_empty_chunks(tmp_path, write_empty_chunks):
+    filename = tmp_path / "test_write_empty_chunks.zspy"
+    data = np.zeros((4, 10, 10))
+    data[0] = 1
+    s = hs.signals.Signal2D(data)
+    kwds = {}
+    if write_empty_chunks is not None:
+        kwds["write_empty_chunks"] = write_empty_chunks
+    s.save(filename, chunks=(1, 10, 10), **kwds)
+    f = zarr.open(filename.__str__(), mode="r")
+    expected = 4 if write_empty_chunks else 1
+    assert f["Experiments/__unnamed__/data"].nchunks_initialized == expected
+    np.testing.assert_array_equal(hs.load(filename).data, data)
+
+
+@pytest.mark.parametrize("cache_size", [None, 0, 2**20])
+@pytest.mark.parametrize("remote", [True, False])
+def test_read_cache_size(tmp_path, monkeypatch, cache_size, remote):
+    if remote:
+        # Local FSStore used as a stand-in for a remote store
+        pytest.importorskip("fsspec", reason="fsspec not installed")
+    from rsciio.zspy import file_reader
+    from rsciio.zspy._api import REMOTE_CACHE_SIZE
+
+    filename = str(tmp_path / "test_read_cache_size.zspy")
+    s = hs.signals.Signal1D(np.arange(100).reshape(10, 10))
+    s.save(filename)
+    store = zarr.storage.FSStore(filename) if remote else filename
+
+    sizes = []
+    LRUStoreCache = zarr.LRUStoreCache
+
+    def cache(store, max_size):
+        sizes.append(max_size)
+        return LRUStoreCache(store, max_size=max_size)
+
+    monkeypatch.setattr(zarr, "LRUStoreCache", cache)
+    d = file_reader(store, cache_size=cache_size)[0]
+    np.testing.assert_array_equal(d["data"], s.data)
+    if cache_size is None:
+        assert sizes == ([REMOTE_CACHE_SIZE] if remote else [])
+    else:
+        assert sizes == ([cache_size] if cache_size else [])
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_write_dtype(tmp_path, lazy):
+    filename = tmp_path / "test_write_dtype.zspy"
+    s = hs.signals.Signal1D(np.arange(24, dtype=np.float32).reshape(4, 6) / 4)
+    s.save(filename, write_dtype="float16")
+    f = zarr.open(filename.__str__(), mode="r")
+    assert f["Experiments/__unnamed__/data"].dtype == np.float16
+    assert s.data.dtype == np.float32
+    s2 = hs.load(filename, lazy=lazy)
+    assert s2.data.dtype == np.float32
+    np.testing.assert_array_equal(s2.data, s.data)
+
+
+def test_write_dtype_chunks(tmp_path):
+    data = np.arange(20 * 30 * 40, dtype=np.float32).reshape(20, 30, 40)
+    s = hs.signals.Signal1D(data)
+    filename = tmp_path / "test_write_dtype_chunks.zspy"
+    s.save(filename, write_dtype="float16")
+    # same chunks as when saving float16 data
+    filename2 = tmp_path / "test_write_dtype_chunks2.zspy"
+    hs.signals.Signal1D(data.astype("float16")).save(filename2)
+    key = "Experiments/__unnamed__/data"
+    dset = zarr.open(filename.__str__(), mode="r")[key]
+    dset2 = zarr.open(filename2.__str__(), mode="r")[key]
+    assert dset.chunks == dset2.chunks
+    np.testing.assert_array_equal(dset[:], dset2[:])
+
+    # with write_dataset=False, the existing dataset is kept
+    s.axes_manager[-1].scale = 2
+    s.save(filename, write_dtype="float16", write_dataset=False, overwrite=True)
+    s2 = hs.load(filename)
+    assert s2.data.dtype == np.float32
+    assert s2.axes_manager[-1].scale == 2
+    np.testing.assert_array_equal(s2.data, dset2[:])
+
+
+@pytest.fixture
+def mem_store():
+    return zarr.storage.MemoryStore()
+
+
+def test_save_load_memory_store(mem_store):
+    from rsciio.zspy import file_reader
+
+    s = hs.signals.Signal1D(np.arange(10))
+    s.metadata.set_item("test.list", [1, "a", (2, 3)])
+    s.metadata.set_item("test.none", None)
+    s.save(mem_store)
+    d = file_reader(mem_store)[0]
+    np.testing.assert_array_equal(d["data"], s.data)
+    assert d["metadata"]["test"]["list"] == [1, "a", (2, 3)]
+    assert d["metadata"]["test"]["none"] is None
+
+
+class CountingStore(zarr.storage.MemoryStore):
+    """A memory store counting the number of writes"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+
+    def __setitem__(self, key, value):
+        self.writes += 1
+        super().__setitem__(key, value)
+
+
+@pytest.mark.parametrize(
+    "item", [list(range(10000)), {f"item{i}": i for i in range(1000)}]
+)
+def test_save_metadata_store_writes(item):
+    s = hs.signals.BaseSignal([0.1])
+    s.metadata.set_item("test", item)
+    store = CountingStore()
+    s.save(store)
+    # The number of writes must not scale with the size of the metadata
+    assert store.writes < 50
+
+
+def test_read_mode_r_plus(tmp_path):
+    from rsciio.zspy._api import _open_zarr
+
+    filename = tmp_path / "test_read_mode_r_plus.zspy"
+    hs.signals.Signal1D(np.arange(10)).save(filename)
+    f = _open_zarr(str(filename), mode="r+")
+    f.attrs["test"] = 1
+    f.create_group("test_group")
+    s = hs.load(filename, mode="r+")
+    np.testing.assert_array_equal(s.data, np.arange(10))
+
+
+@pytest.mark.parametrize("dtype", [np.uint8, np.int32, np.float32, np.complex128])
+def test_read_dataset_multiple_chunks(dtype):
+    from rsciio.zspy._api import ZspyReader
+
+    data = np.arange(6 * 8 * 10).reshape(6, 8, 10).astype(dtype)
+    dset = zarr.array(data, chunks=(2, 3, 10))
+    assert dset.nchunks > 1
+    out = ZspyReader._read_dataset(dset)
+    assert isinstance(out, np.ndarray)
+    assert out.dtype == dtype
+    assert out.shape == data.shape
+    np.testing.assert_array_equal(out, data)
+
+
+def test_save_processes_scheduler():
+    import dask
+
+    from rsciio.zspy import file_reader
+
+    s = hs.signals.Signal2D(np.arange(400.0).reshape(4, 10, 10))
+    store = zarr.storage.MemoryStore()
+    with dask.config.set(scheduler="processes"):
+        s.save(store, chunks=(1, 10, 10))
+    np.testing.assert_array_equal(file_reader(store)[0]["data"], s.data)
+
+
+def test_write_dtype_processes_scheduler():
+    import dask
+
+    from rsciio.zspy import file_reader
+
+    s = hs.signals.Signal2D(np.arange(400, dtype=np.float32).reshape(4, 10, 10))
+    store = zarr.storage.MemoryStore()
+    with dask.config.set(scheduler="processes"):
+        s.save(store, chunks=(1, 10, 10), write_dtype="float16")
+    data = file_reader(store)[0]["data"]
+    assert data.dtype == np.float32
+    np.testing.assert_array_equal(data, s.data)
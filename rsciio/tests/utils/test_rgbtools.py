@@ -60,6 +60,14 @@ class TestRGBTools:
         d = rt.regular_array2rgbx(self.data_c)
         assert d.flags["C_CONTIGUOUS"]
 
+    def test_regular_array2rgbx_view_from_c(self):
+        # C-contiguous data is reinterpreted without being copied
+        d = rt.regular_array2rgbx(self.data_c)
+        assert d.shape == self.data_c.shape[:-1]
+        assert np.shares_memory(d, self.data_c)
+        d = rt.regular_array2rgbx(np.ones((2, 2, 4), dtype=np.uint16))
+        assert d.dtype == rt.rgba16
+
     def test_regular_array2rgbx_corder_from_f(self):
         d = rt.regular_array2rgbx(self.data_f)
         assert d.flags["C_CONTIGUOUS"]
@@ -19,12 +19,17 @@
 import csv
 from datetime import datetime, timedelta
 from dateutil import parser
+import io
+from itertools import repeat
 import logging
 import os
 from packaging.version import Version
 import re
 import warnings
 
+import dask
+import dask.array as da
+from dask.utils import parse_bytes
 import numpy as np
 from tifffile import imwrite, TiffFile, TIFF
 from tifffile import __version__ as tiffversion
@@ -58,10 +63,27 @@ axes_label_codes = {
     "H": "lifetime",
     "L": "exposure",
     "V": "event",
+    "M": "mosaic",
+    "J": "column",
+    "K": "row",
     "Q": None,
     "_": None,
 }
 
+# Keys of the scales, offsets and units dictionaries corresponding to the
+# axes names, see `_order_axes_by_name`
+_axes_name_keys = {
+    "height": "x",
+    "width": "y",
+    "depth": "z",
+    "image series": "z",
+    "time": "z",
+}
+
+# Tags whose values can be large binary payloads (embedded JPEG thumbnail and
+# ICC colour profile), which are only read when explicitly requested
+_THUMBNAIL_TAGS = (0x0201, 0x0202, 0x8773)
+
 
 def file_writer(filename, signal, export_scale=True, extratags=[], **kwds):
     """Writes data to tif using Christoph Gohlke's tifffile library.
@@ -123,13 +145,58 @@ def file_writer(filename, signal, export_scale=True, extratags=[], **kwds):
         dt = get_date_time_from_metadata(signal["metadata"], formatting="datetime")
         kwds["datetime"] = dt
 
+    if isinstance(data, da.Array) and data.ndim > 2 and "tile" not in kwds:
+        # Write the pages as they are computed instead of loading the whole
+        # array in memory
+        kwds.update(shape=data.shape, dtype=data.dtype)
+        data = _iter_pages(data)
+
     imwrite(filename, data, software="hyperspy", photometric=photometric, **kwds)
 
 
+def _iter_pages(data):
+    """Yield the 2D pages of a dask array, computing a block of pages at a time.
+
+    The blocks are limited to the dask ``array.chunk-size``. Since each block
+    is computed separately, a chunk of ``data`` spread over several blocks is
+    computed once per block: data chunked along the navigation axes only are
+    written most efficiently.
+    """
+    page_shape = data.shape[-2:]
+    if data.npartitions == 1:
+        # A single chunk (for example, a file read lazily in one go) can't be
+        # streamed without computing it for every block: compute it once
+        yield from np.asarray(data).reshape((-1,) + page_shape)
+        return
+    # Split the navigation axes so that the blocks contain consecutive whole
+    # pages, which are flattened into a stack of pages without rechunking
+    nav_ndim = data.ndim - 2
+    # Keep the current chunks of the last navigation axis if they fit in
+    # memory, to avoid computing them several times
+    page_nbytes = np.prod(page_shape) * data.dtype.itemsize
+    limit = parse_bytes(dask.config.get("array.chunk-size"))
+    nav_chunks = data.chunks[nav_ndim - 1]
+    if max(nav_chunks) * page_nbytes > limit:
+        nav_chunks = "auto"
+    chunks = {i: 1 for i in range(nav_ndim - 1)}
+    chunks.update({nav_ndim - 1: nav_chunks, nav_ndim: -1, nav_ndim + 1: -1})
+    data = data.rechunk(chunks).reshape((-1,) + page_shape)
+    for block in data.blocks:
+        yield from np.asarray(block)
+
+
 file_writer.__doc__ %= (FILENAME_DOC.replace("read", "write to"), SIGNAL_DOC)
 
 
-def file_reader(filename, lazy=False, force_read_resolution=False, **kwds):
+def file_reader(
+    filename,
+    lazy=False,
+    force_read_resolution=False,
+    load_thumbnails=False,
+    memmap=False,
+    prefetch_limit=None,
+    **kwds,
+):
     """
     Read data from tif files using Christoph Gohlke's tifffile library.
     The units and the scale of images saved with ImageJ or Digital
@@ -145,6 +212,24 @@ def file_reader(filename, lazy=False, force_read_resolution=False, **kwds):
         and ``resolution_unit`` tiff tags. Beware: most software don't (properly)
         use these tags when saving ``.tiff`` files.
         See `<https://www.awaresystems.be/imaging/tiff/tifftags/resolutionunit.html>`_.
+    load_thumbnails: bool, Default=False
+        Read the tags storing the embedded JPEG thumbnail (``JPEGInterchangeFormat``
+        and ``JPEGInterchangeFormatLength``) and the ICC colour profile
+        (``InterColorProfile``) into the ``original_metadata``. By default,
+        these tags are skipped to avoid reading potentially large binary
+        payloads from the file.
+    memmap: bool, Default=False
+        If ``True`` and the data is stored uncompressed and contiguously in the
+        file, the data is memory-mapped (read-only) instead of being read into
+        memory. Otherwise, the data is decoded as usual. When ``lazy=True``,
+        memory-mappable data is always memory-mapped.
+    prefetch_limit: int or None, Default=None
+        If the size of the file (in bytes) is smaller than ``prefetch_limit``,
+        the whole file is read in a single sequential pass and the data is
+        decoded from memory. This avoids issuing one read request per strip or
+        tile, which can be slow on network file systems. Only used when
+        ``lazy=False`` and ``memmap=False``. If ``None``, prefetching is
+        disabled.
     hamamatsu_streak_axis_type: str, optional
         Decide the type of the time axis for hamamatsu streak files:
 
@@ -175,11 +260,29 @@ def file_reader(filename, lazy=False, force_read_resolution=False, **kwds):
     """
     tmp = kwds.pop("hamamatsu_streak_axis_type", None)
 
-    with TiffFile(filename, **kwds) as tiff:
+    file = filename
+    if (
+        prefetch_limit is not None
+        and not (lazy or memmap)
+        and os.path.getsize(filename) < prefetch_limit
+    ):
+        with open(filename, "rb") as f:
+            file = io.BytesIO(f.read())
+
+    with TiffFile(file, **kwds) as tiff:
         if tmp is not None:
             kwds.update({"hamamatsu_streak_axis_type": tmp})
         dict_list = [
-            _read_serie(tiff, serie, filename, force_read_resolution, lazy=lazy, **kwds)
+            _read_serie(
+                tiff,
+                serie,
+                filename,
+                force_read_resolution,
+                lazy=lazy,
+                memmap=memmap,
+                load_thumbnails=load_thumbnails,
+                **kwds,
+            )
             for serie in tiff.series
         ]
 
@@ -191,37 +294,17 @@ file_reader.__doc__ %= (FILENAME_DOC, LAZY_DOC, RETURNS_DOC)
 
 def _order_axes_by_name(names: list, scales: dict, offsets: dict, units: dict):
     """order axes by names in lists"""
-    scales_new = [1.0] * len(names)
-    offsets_new = [0.0] * len(names)
-    units_new = [None] * len(names)
-    for i, name in enumerate(names):
-        if name == "height":
-            scales_new[i] = scales["x"]
-            offsets_new[i] = offsets["x"]
-            units_new[i] = units["x"]
-        elif name == "width":
-            scales_new[i] = scales["y"]
-            offsets_new[i] = offsets["y"]
-            units_new[i] = units["y"]
-        elif name in ["depth", "image series", "time"]:
-            scales_new[i] = scales["z"]
-            offsets_new[i] = offsets["z"]
-            units_new[i] = units["z"]
+    keys = [_axes_name_keys.get(name) for name in names]
+    scales_new = [1.0 if key is None else scales[key] for key in keys]
+    offsets_new = [0.0 if key is None else offsets[key] for key in keys]
+    units_new = [None if key is None else units[key] for key in keys]
     return scales_new, offsets_new, units_new
 
 
 def _build_axes_dictionaries(shape, names=None, scales=None, offsets=None, units=None):
     """Build axes dictionaries from a set of lists"""
-    if names is None:
-        names = [""] * len(shape)
-    if scales is None:
-        scales = [1.0] * len(shape)
-    if scales is None:
-        scales = [0.0] * len(shape)
-    if units is None:
-        scales = [None] * len(shape)
-
-    axes = [
+    # Missing values are filled lazily, without allocating a list per default
+    return [
         {
             "size": size,
             "name": str(name),
@@ -229,9 +312,14 @@ def _build_axes_dictionaries(shape, names=None, scales=None, offsets=None, units
             "offset": offset,
             "units": unit,
         }
-        for size, name, scale, offset, unit in zip(shape, names, scales, offsets, units)
+        for size, name, scale, offset, unit in zip(
+            shape,
+            repeat("") if names is None else names,
+            repeat(1.0) if scales is None else scales,
+            repeat(0.0) if offsets is None else offsets,
+            repeat(None) if units is None else units,
+        )
     ]
-    return axes
 
 
 def _read_serie(
@@ -240,8 +328,9 @@ def _read_serie(
     filename,
     force_read_resolution=False,
     lazy=False,
-    memmap=None,
+    memmap=False,
     RGB_as_structured_array=True,
+    load_thumbnails=False,
     **kwds,
 ):
     axes = serie.axes
@@ -263,11 +352,20 @@ def _read_serie(
         shape = shape[:-1]
 
     if Version(tiffversion) >= Version("2020.2.16"):
-        op = {tag.name: tag.value for tag in page.tags}
+        tags = page.tags
     else:
-        op = {key: tag.value for key, tag in page.tags.items()}
+        tags = page.tags.values()
+    # Filter on the tag code before accessing `value`, which may trigger
+    # reading the value from the file
+    op = {
+        tag.name: tag.value
+        for tag in tags
+        if load_thumbnails or tag.code not in _THUMBNAIL_TAGS
+    }
 
-    names = [axes_label_codes[axis] for axis in axes]
+    # Axes codes unknown to rosettasciio (for example from newer tifffile
+    # versions) are read as unnamed axes
+    names = [axes_label_codes.get(axis, "") for axis in axes]
 
     _logger.debug("Tiff tags list: %s" % op)
     _logger.debug("Photometric: %s" % op["PhotometricInterpretation"])
@@ -324,16 +422,23 @@ def _read_serie(
         md["Signal"]["Noise_properties"] = {"Variance_linear_model": dic}
 
     data_args = serie, is_rgb
+    # Uncompressed and contiguous data can be mapped directly from the file,
+    # so that only the pages which are accessed are read from disk
+    is_memmappable = (
+        page.is_memmappable and getattr(serie, "dataoffset", None) is not None
+    )
     if lazy:
         from dask import delayed
-        from dask.array import from_delayed
+        from dask.array import from_array, from_delayed
 
-        memmap = "memmap"
-        val = delayed(_load_data, pure=True)(*data_args, memmap=memmap, **kwds)
-        dc = from_delayed(val, dtype=dtype, shape=shape)
-        # TODO: maybe just pass the memmap from tiffile?
+        if is_memmappable:
+            dc = from_array(_load_data(*data_args, memmap="memmap", **kwds))
+        else:
+            val = delayed(_load_data, pure=True)(*data_args, memmap="memmap", **kwds)
+            dc = from_delayed(val, dtype=dtype, shape=shape)
     else:
-        dc = _load_data(*data_args, memmap=memmap, **kwds)
+        out = "memmap" if memmap and is_memmappable else None
+        dc = _load_data(*data_args, memmap=out, **kwds)
 
     if _is_streak_hamamatsu(op):
         op.update(
@@ -669,12 +774,12 @@ def _get_hamamatsu_streak_description(tiff, op):
     fh = tiff.filehandle
     # Reading the x axis
     fh.seek(x_scale_address, 0)
-    xax = np.fromfile(fh, dtype="f", count=xlen)
+    xax = fh.read_array("f", count=xlen)
     if y_scale_address is None:
         yax = np.arange(ylen)
     else:
         fh.seek(y_scale_address, 0)
-        yax = np.fromfile(fh, dtype="f", count=ylen)
+        yax = fh.read_array("f", count=ylen)
 
     dict_meta["Scaling"]["ScalingXaxis"] = xax
     dict_meta["Scaling"]["ScalingYaxis"] = yax
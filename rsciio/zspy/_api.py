@@ -21,6 +21,7 @@ from collections.abc import MutableMapping
 
 import dask.array as da
 import numcodecs
+import numpy as np
 import zarr
 
 from rsciio.docstrings import (
@@ -34,6 +35,13 @@ from rsciio._hierarchical import HierarchicalWriter, HierarchicalReader, version
 
 _logger = logging.getLogger(__name__)
 
+# Default size of the cache used when reading from remote stores
+REMOTE_CACHE_SIZE = 256 * 2**20
+
+# The codecs are stateless and can be shared between datasets
+_JSON_CODEC = numcodecs.JSON()
+_VLEN_INT_CODEC = numcodecs.VLenArray(int)
+
 
 # -----------------------
 # File format description
@@ -63,6 +71,26 @@ _logger = logging.getLogger(__name__)
 # Experiments instance
 
 
+def _chunks_aligned(dask_chunks, zarr_chunks):
+    """
+    Check if the dask chunks are integer multiples of the zarr chunks, in
+    which case each zarr chunk is written by a single dask chunk.
+
+    Parameters
+    ----------
+    dask_chunks : tuple of tuple of int
+        The chunks of the dask array, as given by :py:attr:`dask.array.Array.chunks`.
+    zarr_chunks : tuple of int
+        The chunk shape of the zarr array.
+    """
+    # The last chunk along each axis can be of any size, since it is bounded
+    # by the array shape
+    return all(
+        all(c % z == 0 for c in chunks[:-1])
+        for chunks, z in zip(dask_chunks, zarr_chunks)
+    )
+
+
 class ZspyReader(HierarchicalReader):
 
     _file_type = "zspy"
@@ -72,39 +100,99 @@ class ZspyReader(HierarchicalReader):
         self.Dataset = zarr.Array
         self.Group = zarr.Group
 
+    @staticmethod
+    def _read_dataset(dataset):
+        if isinstance(dataset, zarr.Array) and dataset.nchunks > 1:
+            # Use dask to read and decompress the chunks in parallel directly
+            # into the output array, with the threaded scheduler, since a
+            # distributed scheduler would have to send the chunks back
+            out = np.empty(dataset.shape, dtype=dataset.dtype)
+            da.store(
+                da.from_array(dataset, chunks=dataset.chunks),
+                out,
+                lock=False,
+                scheduler="threads",
+            )
+            return out
+        return np.asanyarray(dataset)
+
+    def group2signaldict(self, group, lazy=False):
+        exp = super().group2signaldict(group, lazy=lazy)
+        # Data saved with a `write_dtype` are converted back to their dtype
+        original_dtype = group["data"].attrs.get("original_dtype")
+        if original_dtype is not None:
+            exp["data"] = exp["data"].astype(original_dtype)
+        return exp
+
 
 class ZspyWriter(HierarchicalWriter):
 
     target_size = 1e8
+    # Smaller chunks are used for remote stores, since each chunk is
+    # retrieved with a separate request
+    remote_target_size = 1.6e7
 
-    def __init__(self, file, signal, expg, **kwargs):
+    def __init__(self, file, signal, expg, write_dtype=None, **kwargs):
         super().__init__(file, signal, expg, **kwargs)
+        self.write_dtype = write_dtype
         self.Dataset = zarr.Array
-        self.unicode_kwds = {"dtype": object, "object_codec": numcodecs.JSON()}
+        self.unicode_kwds = {"dtype": object, "object_codec": _JSON_CODEC}
         self.ragged_kwds = {
             "dtype": object,
-            "object_codec": numcodecs.VLenArray(int),
+            "object_codec": _VLEN_INT_CODEC,
             "exact": True,
         }
 
+    def write(self):
+        self.write_signal(
+            self.signal, self.group, dtype=self.write_dtype, **self.kwds
+        )
+
+    @classmethod
+    def _get_target_size(cls, group):
+        if isinstance(group.store, zarr.storage.FSStore):
+            return cls.remote_target_size
+        return cls.target_size
+
     @staticmethod
     def _get_object_dset(group, data, key, chunks, **kwds):
         """Creates a Zarr Array object for saving ragged data"""
         these_kwds = kwds.copy()
         these_kwds.update(dict(dtype=object, exact=True, chunks=chunks))
         dset = group.require_dataset(
-            key, data.shape, object_codec=numcodecs.VLenArray(int), **these_kwds
+            key, data.shape, object_codec=_VLEN_INT_CODEC, **these_kwds
         )
         return dset
 
     @staticmethod
     def _store_data(data, dset, group, key, chunks):
         """Write data to zarr format."""
+        store_kwds = {}
+        if isinstance(data, zarr.Array):
+            # Copy chunk by chunk directly into `dset` instead of reading the
+            # whole source array into memory
+            data = da.from_array(data, chunks=data.chunks)
+            # The source is accessible in this process only (for example, a
+            # MemoryStore), so that the chunks must be copied with threads
+            store_kwds["scheduler"] = "threads"
+        elif isinstance(data, np.ndarray) and dset.nchunks > 1:
+            # Use threads to compress and write the chunks in parallel, since
+            # the data are already in memory; `name=False` avoids hashing the
+            # data
+            data = da.from_array(data, chunks=dset.chunks, name=False)
+            store_kwds["scheduler"] = "threads"
         if isinstance(data, da.Array):
-            if data.chunks != dset.chunks:
-                data = data.rechunk(dset.chunks)
+            if not _chunks_aligned(data.chunks, dset.chunks):
+                # Rechunk to the nearest multiple of the zarr chunks rather
+                # than to the zarr chunks, to keep the number of tasks low
+                data = data.rechunk(
+                    tuple(
+                        max(1, round(c[0] / z)) * z
+                        for c, z in zip(data.chunks, dset.chunks)
+                    )
+                )
             # lock=False is necessary with the distributed scheduler
-            data.store(dset, lock=False)
+            data.store(dset, lock=False, **store_kwds)
         else:
             dset[:] = data
 
@@ -125,15 +213,28 @@ def file_writer(filename, signal, close_file=True, **kwds):
     chunks : tuple of integer or None, default=None
         Define the chunking used for saving the dataset. If None, calculates
         chunks for the signal, with preferably at least one chunk per signal
-        space.
+        space. The chunks are calculated to be about 100 MB, or about 16 MB
+        when saving to a :py:class:`zarr.storage.FSStore` (for example, a
+        remote storage).
     compressor : numcodecs compression, optional
         A compressor can be passed to the save function to compress the data
         efficiently, see `Numcodecs codec <https://numcodecs.readthedocs.io/en/stable>`_.
-        The default is to use a Blosc compressor.
+        The default is to use a Blosc compressor: ``lz4`` with bit shuffle for
+        floating point data and ``zstd`` with byte shuffle otherwise.
     write_dataset : bool, default=True
         If ``False``, doesn't write the dataset when writing the file. This can
         be useful to overwrite signal attributes only (for example ``axes_manager``)
         without having to write the whole dataset, which can take time.
+    write_empty_chunks : bool, default=False
+        If ``False``, chunks which only contain the fill value (0 for numerical
+        data) are not written to the store, which saves storage space and
+        writing time for sparse data. See :py:func:`zarr.creation.create`.
+    write_dtype : numpy dtype or None, default=None
+        If not ``None``, the data are written with this dtype, for example
+        ``"float16"`` to halve the size of ``float32`` data, and converted
+        chunk by chunk while writing. The original dtype is stored in the file
+        and the data are converted back to it when reading. This conversion is lossy if
+        ``write_dtype`` has a lower precision or range than the data.
     **kwds
         The keyword arguments are passed to the
         :py:meth:`zarr.hierarchy.Group.require_dataset` function.
@@ -141,13 +242,27 @@ def file_writer(filename, signal, close_file=True, **kwds):
     Examples
     --------
     >>> from numcodecs import Blosc
-    >>> compressor=Blosc(cname='zstd', clevel=1, shuffle=Blosc.SHUFFLE) # Used by default
+    >>> compressor=Blosc(cname='zstd', clevel=1, shuffle=Blosc.SHUFFLE) # Default for non-float data
     >>> file_writer('test.zspy', s, compressor = compressor) # will save with Blosc compression
     """
+    data = signal["data"]
+    write_dtype = kwds.get("write_dtype")
+    dtype = data.dtype if write_dtype is None else np.dtype(write_dtype)
+
     if "compressor" not in kwds:
-        kwds["compressor"] = numcodecs.Blosc(
-            cname="zstd", clevel=1, shuffle=numcodecs.Blosc.SHUFFLE
-        )
+        if np.issubdtype(dtype, np.floating):
+            # bit shuffling exposes the redundancy of the float bytes, which
+            # lz4 can compress at a higher throughput than zstd
+            kwds["compressor"] = numcodecs.Blosc(
+                cname="lz4", clevel=5, shuffle=numcodecs.Blosc.BITSHUFFLE
+            )
+        else:
+            kwds["compressor"] = numcodecs.Blosc(
+                cname="zstd", clevel=1, shuffle=numcodecs.Blosc.SHUFFLE
+            )
+
+    if "write_empty_chunks" not in kwds:
+        kwds["write_empty_chunks"] = False
 
     if isinstance(filename, MutableMapping):
         store = filename
@@ -187,11 +302,16 @@ def file_writer(filename, signal, close_file=True, **kwds):
     try:
         writer = ZspyWriter(f, signal, expg, **kwds)
         writer.write()
-    except Exception:
-        raise
     finally:
         del smd["record_by"]
 
+    if write_dataset and expg["data"].dtype != data.dtype:
+        expg["data"].attrs["original_dtype"] = data.dtype.str
+
+    if not isinstance(store, (zarr.N5Store, zarr.N5FSStore)):
+        # Store all metadata in a single key to read it in one request
+        zarr.consolidate_metadata(store)
+
     if isinstance(store, (zarr.ZipStore, zarr.DBMStore, zarr.LMDBStore)):
         if close_file:
             store.close()
@@ -202,7 +322,23 @@ def file_writer(filename, signal, close_file=True, **kwds):
 file_writer.__doc__ %= (FILENAME_DOC.replace("read", "write to"), SIGNAL_DOC)
 
 
-def file_reader(filename, lazy=False, **kwds):
+def _open_zarr(filename, mode="r", **kwds):
+    """Open a zarr group, using the consolidated metadata if available.
+
+    The consolidated metadata are only used in read-only mode, since groups
+    opened with consolidated metadata can't be modified.
+    """
+    if mode == "r":
+        try:
+            return zarr.open_consolidated(filename, mode=mode, **kwds)
+        except KeyError:
+            # The metadata of files written with older versions of
+            # RosettaSciIO are not consolidated
+            pass
+    return zarr.open(filename, mode=mode, **kwds)
+
+
+def file_reader(filename, lazy=False, cache_size=None, **kwds):
     """Read data from zspy files saved with the HyperSpy zarr format
     specification.
 
@@ -210,6 +346,12 @@ def file_reader(filename, lazy=False, **kwds):
     ----------
     %s
     %s
+    cache_size : int, optional
+        Size in bytes of the :py:class:`zarr.storage.LRUStoreCache` used to
+        keep the metadata and chunks read from the store in memory. If ``None``,
+        a 256 MB cache is used for :py:class:`zarr.storage.FSStore` (for
+        example, a remote storage) and no cache is used otherwise. Set to ``0``
+        to disable the cache.
     **kwds: optional
         Pass keyword arguments to the :py:meth:`zarr.open` function.
 
@@ -217,7 +359,16 @@ def file_reader(filename, lazy=False, **kwds):
     """
     mode = kwds.pop("mode", "r")
     try:
-        f = zarr.open(filename, mode=mode, **kwds)
+        store = zarr.storage.normalize_store_arg(
+            filename, storage_options=kwds.pop("storage_options", None), mode=mode
+        )
+        if cache_size is None:
+            cache_size = (
+                REMOTE_CACHE_SIZE if isinstance(store, zarr.storage.FSStore) else 0
+            )
+        if cache_size:
+            store = zarr.LRUStoreCache(store, max_size=cache_size)
+        f = _open_zarr(store, mode=mode, **kwds)
     except Exception:
         _logger.error(
             "The file can't be read. It may be possible that the zspy file is "